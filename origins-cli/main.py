@@ -1,4 +1,10 @@
+import ast
+import fnmatch
+import hashlib
 import json
+import math
+import re
+import threading
 import typer
 import os
 import shutil
@@ -18,6 +24,10 @@ import questionary
 from github import Github
 from concurrent.futures import ThreadPoolExecutor
 from google.genai import errors
+try:
+    import tomllib # Python 3.11+
+except ImportError:
+    tomllib = None
 from rich.panel import Panel
 
 app = typer.Typer(help="Origins Intelligent Dev Tool v0.2.4")
@@ -63,10 +73,10 @@ def save_config(key, value):
     with open(CONFIG_FILE, "w") as f:
         json.dump(config, f, indent=4)
 
-def get_project_type():
-    if os.path.exists("package.json"):
+def get_project_type(path="."):
+    if os.path.exists(os.path.join(path, "package.json")):
         return "web"
-    elif os.path.exists("requirements.txt") or os.path.exists("pyproject.toml"):
+    elif os.path.exists(os.path.join(path, "requirements.txt")) or os.path.exists(os.path.join(path, "pyproject.toml")):
         return "ai"
     return "unknown"
 
@@ -195,6 +205,9 @@ def clone(template_id: str = typer.Argument(None)):
         border_style="green"
     ))
 
+class QuotaExhaustedError(Exception):
+    """Raised once retry_generate has backed off as far as the Free Tier allows."""
+
 def retry_generate(client, model_id, contents):
     """Handles 429 errors by waiting and retrying to stay within Free Tier limits."""
     for attempt in range(5):
@@ -208,13 +221,104 @@ def retry_generate(client, model_id, contents):
                 time.sleep(wait_time)
             else:
                 raise e
-    raise Exception("Max retries exceeded. AI quota is fully exhausted.")
+    raise QuotaExhaustedError("Max retries exceeded. AI quota is fully exhausted.")
+
+# --- BUILD JOURNAL ---
+# Lives inside the generated project so `origins build --resume` can pick up where a run died.
+BUILD_JOURNAL = ".origins-build.json"
+journal_lock = threading.Lock()
+FENCELESS_EXTENSIONS = {".py", ".json", ".toml", ".js", ".ts", ".tsx", ".jsx", ".css", ".yml", ".yaml"}
+
+def load_journal(target_dir):
+    path = os.path.join(target_dir, BUILD_JOURNAL)
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            try:
+                return json.load(f)
+            except json.JSONDecodeError:
+                return None # Treat a torn journal as missing
+    return None
+
+def save_journal(target_dir, journal, file_path=None, **changes):
+    """Writes the journal atomically so a crash never leaves it half-written.
+
+    Entry changes are applied under the same lock as the dump, since swarm agents save concurrently.
+    """
+    path = os.path.join(target_dir, BUILD_JOURNAL)
+    with journal_lock:
+        if file_path:
+            journal["files"][file_path].update(changes)
+        journal["updated_at"] = time.time()
+        with open(path + ".tmp", "w") as f:
+            json.dump(journal, f, indent=2)
+        os.replace(path + ".tmp", path)
+
+def strip_fences(text):
+    """Removes the markdown code fence Gemini likes to wrap files in."""
+    lines = text.strip().splitlines()
+    if lines and lines[0].startswith("```"):
+        lines = lines[1:]
+    if lines and lines[-1].strip() == "```":
+        lines = lines[:-1]
+    return "\n".join(lines) + "\n"
+
+def validate_file(file_path, content):
+    """Returns an error message if the generated file does not parse, else None."""
+    ext = os.path.splitext(file_path)[1].lower()
+    try:
+        if ext == ".py":
+            ast.parse(content)
+        elif ext == ".json":
+            json.loads(content)
+        elif ext == ".toml" and tomllib:
+            tomllib.loads(content)
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+    # Markdown legitimately nests fenced blocks, code and config files never do
+    if ext in FENCELESS_EXTENSIONS and "```" in content:
+        return "Leftover markdown fence"
+    return None
+
+def file_hash(content):
+    return hashlib.sha256(content.encode()).hexdigest()
+
+def needs_generation(target_dir, file_path, entry):
+    """A file is kept only if the journal marks it written and it still parses on disk."""
+    full_path = os.path.join(target_dir, file_path)
+    if entry.get("status") != "written" or not os.path.exists(full_path):
+        return True
+    with open(full_path, "r") as f:
+        content = f.read()
+    if validate_file(file_path, content):
+        return True
+    entry["sha256"] = file_hash(content) # Keep manual edits, just refresh the record
+    return False
+
+def generate_file(client, target_dir, journal, file_path):
+    """Generates one file, validates it and records the outcome in the journal."""
+    entry = journal["files"][file_path]
+    full_path = os.path.join(target_dir, file_path)
+    try:
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        res = retry_generate(client, 'gemini-3-flash-preview', entry["prompt"])
+        if not res.text:
+            raise ValueError("AI returned an empty or blocked response")
+        content = strip_fences(res.text)
+        with open(full_path, "w") as f:
+            f.write(content)
+    except Exception as e:
+        save_journal(target_dir, journal, file_path, status="failed", error=f"{type(e).__name__}: {e}")
+        raise
+    error = validate_file(file_path, content)
+    save_journal(target_dir, journal, file_path, status="invalid" if error else "written", sha256=file_hash(content), error=error)
+    return error
 
 @app.command()
 def build(
     prompt: str = typer.Argument(None, help="Describe the app you want to build"),
     wizard: bool = typer.Option(False, "--wizard", "-w", help="Launch interactive setup"),
-    swarm: bool = typer.Option(False, "--swarm", "-s", help="Use parallel AI agents")
+    swarm: bool = typer.Option(False, "--swarm", "-s", help="Use parallel AI agents"),
+    resume: bool = typer.Option(False, "--resume", "-r", help="Continue an interrupted build, regenerating only failed or missing files")
 ):
     """🚀 Origins Build: High-speed app generation with Quota Management."""
     config = load_config()
@@ -226,64 +330,248 @@ def build(
     client = genai.Client(api_key=gemini_key)
 
     # --- 1. MODE SELECTION ---
-    if wizard:
-        answers = questionary.form(
-            name=questionary.text("Project Name (slug):", default="origins-app"),
-            stack=questionary.select("Framework:", choices=["FastAPI", "Next.js", "Flask"]),
-            db=questionary.select("Database:", choices=["PostgreSQL", "MongoDB", "SQLite"]),
-            features=questionary.checkbox("Include Features:", choices=["Docker", "Auth", "CI/CD"]),
-        ).ask()
-        project_name = answers['name']
-        final_prompt = f"Build a {answers['stack']} app with {answers['db']}. Features: {', '.join(answers['features'])}"
-    else:
-        if not prompt:
-            prompt = Prompt.ask("What would you like to build today?")
+    if resume:
         project_name = Prompt.ask("Project Name", default="origins-ai-app")
-        final_prompt = prompt
+        target_dir = os.path.join(PROJECTS_DIR, project_name)
+        journal = load_journal(target_dir)
+        if not journal:
+            console.print(f"[red]Error: No build journal found in {target_dir}[/red]")
+            raise typer.Exit()
+        final_prompt = journal["prompt"]
+        swarm = journal["mode"] == "swarm"
+        console.print(f"[dim]Resuming build: {final_prompt}[/dim]")
+    else:
+        if wizard:
+            answers = questionary.form(
+                name=questionary.text("Project Name (slug):", default="origins-app"),
+                stack=questionary.select("Framework:", choices=["FastAPI", "Next.js", "Flask"]),
+                db=questionary.select("Database:", choices=["PostgreSQL", "MongoDB", "SQLite"]),
+                features=questionary.checkbox("Include Features:", choices=["Docker", "Auth", "CI/CD"]),
+            ).ask()
+            project_name = answers['name']
+            final_prompt = f"Build a {answers['stack']} app with {answers['db']}. Features: {', '.join(answers['features'])}"
+        else:
+            if not prompt:
+                prompt = Prompt.ask("What would you like to build today?")
+            project_name = Prompt.ask("Project Name", default="origins-ai-app")
+            final_prompt = prompt
+
+        target_dir = os.path.join(PROJECTS_DIR, project_name)
+        journal = {"prompt": final_prompt, "mode": "swarm" if swarm else "normal", "files": None}
 
-    target_dir = os.path.join(PROJECTS_DIR, project_name)
     os.makedirs(target_dir, exist_ok=True)
+    save_journal(target_dir, journal)
+
+    # --- 2. PLANNING ---
+    if journal["files"] is None:
+        if swarm:
+            tasks = {
+                "api/main.py": f"Core API entry point for {final_prompt}",
+                "requirements.txt": f"Dependencies for {final_prompt}",
+                "README.md": f"Professional documentation for {final_prompt}",
+                ".gitignore": "Standard python and env gitignore"
+            }
+        else:
+            try:
+                with console.status("[bold cyan]Architecting...[/bold cyan]"):
+                    struct_res = retry_generate(client, 'gemini-3-flash-preview', f"Return ONLY a JSON list of files for: {final_prompt}")
+            except Exception as e:
+                console.print(f"[red]Error: {e} Run [bold]origins build --resume[/bold] to retry.[/red]")
+                raise typer.Exit(1)
+            try:
+                files = json.loads(strip_fences(struct_res.text))
+            except json.JSONDecodeError:
+                files = None
+            # `list` is shadowed by the command below, so compare against the literal's type
+            if not isinstance(files, type([])) or not all(isinstance(f_path, str) for f_path in files):
+                console.print("[red]Error: AI returned an unreadable file plan. Run [bold]origins build --resume[/bold] to retry.[/red]")
+                raise typer.Exit(1)
+            tasks = {f_path: f"Write code for {f_path} in {final_prompt}" for f_path in files}
+        journal["files"] = {f_path: {"prompt": p, "status": "pending"} for f_path, p in tasks.items()}
+
+    # Plans often list folders like "src/" next to files; there is nothing to generate for them
+    journal["files"] = {
+        f_path: entry for f_path, entry in journal["files"].items()
+        if f_path.strip() and not f_path.endswith(("/", "\\")) and not os.path.isdir(os.path.join(target_dir, f_path))
+    }
+    save_journal(target_dir, journal)
 
-    # --- 2. EXECUTION ---
+    pending = [f_path for f_path, entry in journal["files"].items() if needs_generation(target_dir, f_path, entry)]
+    skipped = len(journal["files"]) - len(pending)
+    if skipped:
+        console.print(f"[dim]Reusing {skipped} intact file(s) from the previous run.[/dim]")
+
+    # --- 3. EXECUTION ---
     if swarm:
         console.print(Panel(f"🐝 [bold magenta]Swarm Mode[/bold magenta]\nDeploying parallel agents...", border_style="magenta"))
-        tasks = {
-            "api/main.py": f"Core API entry point for {final_prompt}",
-            "requirements.txt": f"Dependencies for {final_prompt}",
-            "README.md": f"Professional documentation for {final_prompt}",
-            ".gitignore": "Standard python and env gitignore"
-        }
-
-        def run_agent(file_path, task_prompt):
-            full_path = os.path.join(target_dir, file_path)
-            os.makedirs(os.path.dirname(full_path), exist_ok=True)
-            # Use retry logic to prevent swarm from crashing on 429
-            res = retry_generate(client, 'gemini-3-flash-preview', task_prompt)
-            with open(full_path, "w") as f:
-                f.write(res.text.strip().replace("```python", "").replace("```", ""))
+
+        def run_agent(file_path):
+            # Failures are already journaled, the swarm keeps going
+            try:
+                generate_file(client, target_dir, journal, file_path)
+            except Exception as e:
+                console.print(f"[red]Error generating {file_path}: {e}[/red]")
 
         with ThreadPoolExecutor(max_workers=2) as executor: # Keep workers low for Free Tier
-            executor.map(lambda p: run_agent(p[0], p[1]), tasks.items())
+            executor.map(run_agent, pending)
     else:
         # NORMAL MODE
-        with console.status("[bold cyan]Architecting...[/bold cyan]"):
-            struct_res = retry_generate(client, 'gemini-3-flash-preview', f"Return ONLY a JSON list of files for: {final_prompt}")
-            files = json.loads(struct_res.text.strip().replace("```json", "").replace("```", ""))
-
-        for f_path in track(files, description="Writing files..."):
-            full_path = os.path.join(target_dir, f_path)
-            os.makedirs(os.path.dirname(full_path), exist_ok=True)
-            code_res = retry_generate(client, 'gemini-3-flash-preview', f"Write code for {f_path} in {final_prompt}")
-            with open(full_path, "w") as f:
-                f.write(code_res.text.strip())
+        for f_path in track(pending, description="Writing files..."):
+            try:
+                generate_file(client, target_dir, journal, f_path)
+            except QuotaExhaustedError as e:
+                # Quota is gone, stop paying for retries and let --resume finish the job
+                console.print(f"[red]Error generating {f_path}: {e}[/red]")
+                break
+            except Exception as e:
+                console.print(f"[red]Error generating {f_path}: {e}[/red]")
+
+    broken = {f_path: entry for f_path, entry in journal["files"].items() if entry["status"] != "written"}
+    if broken:
+        table = Table(title="Files Needing Regeneration")
+        table.add_column("File", style="cyan")
+        table.add_column("Status", style="yellow")
+        table.add_column("Reason", style="red")
+        for f_path, entry in broken.items():
+            table.add_row(f_path, entry["status"], entry.get("error") or "")
+        console.print(table)
+        console.print(f"[yellow]Run [bold]origins build --resume[/bold] with project [bold]{project_name}[/bold] to retry them.[/yellow]")
+        raise typer.Exit(1)
 
     console.print(Panel(f"✅ Build Complete: {target_dir}", title="Origins Factory", border_style="green"))
 
     if Confirm.ask("Push to GitHub?"):
         ship_to_github(target_dir, project_name)
 
+# --- PROJECT CONTEXT INDEX ---
+INDEX_DIR = os.path.join(CONFIG_DIR, "index")
+INDEX_IGNORE = {".git", "node_modules", "venv", ".venv", "env", "__pycache__", ".next", "dist", "build", ".mypy_cache", ".pytest_cache"}
+INDEX_MAX_BYTES = 256 * 1024 # Skip lockfiles, bundles and other giants
+CHUNK_LINES = 40
+# Never ship these to Gemini or the on-disk index, even when .gitignore forgets them
+INDEX_SECRET_PATTERNS = [".env", ".env.*", "*.pem", "*.key", "*.p12", "*.pfx", "id_rsa*", "id_ed25519*",
+                         ".npmrc", ".pypirc", ".netrc", ".git-credentials", "*.tfvars", "*.tfstate", "credentials*", "secrets.*"]
+DEFAULT_CONTEXT_BUDGET = 6000 # Tokens of project context packed into an `ask --project` prompt
+
+def tokenize(text):
+    """Lowercased identifiers, with snake_case parts indexed on their own as well."""
+    terms = []
+    for word in re.findall(r"[A-Za-z_][A-Za-z0-9_]+", text):
+        word = word.lower()
+        terms.append(word)
+        if "_" in word:
+            terms.extend(part for part in word.split("_") if len(part) > 1)
+    return terms
+
+def chunk_file(text):
+    lines = text.splitlines()
+    chunks = []
+    for start in range(0, len(lines), CHUNK_LINES):
+        body = "\n".join(lines[start:start + CHUNK_LINES])
+        if not body.strip():
+            continue
+        terms = tokenize(body)
+        tf = {}
+        for t in terms:
+            tf[t] = tf.get(t, 0) + 1
+        chunks.append({"line": start + 1, "text": body, "tf": tf, "length": len(terms)})
+    return chunks
+
+def update_index(root):
+    """Re-chunks only files whose mtime or size changed since the last run."""
+    os.makedirs(INDEX_DIR, exist_ok=True)
+    index_path = os.path.join(INDEX_DIR, hashlib.sha1(root.encode()).hexdigest() + ".json")
+    index = {"root": root, "files": {}}
+    if os.path.exists(index_path):
+        with open(index_path, "r") as f:
+            try:
+                index = json.load(f)
+            except json.JSONDecodeError:
+                pass # Rebuild from scratch
+
+    old_files = index["files"]
+    files = {}
+    changed = 0
+    # Same file set a deploy would see, so anything .gitignore hides stays out of prompts
+    for rel_path in list_build_inputs(root):
+        parts = re.split(r"[\\/]", rel_path)
+        if any(part in INDEX_IGNORE for part in parts[:-1]):
+            continue
+        if any(fnmatch.fnmatch(parts[-1].lower(), p) for p in INDEX_SECRET_PATTERNS):
+            continue
+        full_path = os.path.join(root, rel_path)
+        try:
+            stat = os.stat(full_path)
+        except OSError:
+            continue
+        if stat.st_size > INDEX_MAX_BYTES:
+            continue
+        cached = old_files.get(rel_path)
+        if cached and cached["mtime"] == stat.st_mtime and cached["size"] == stat.st_size:
+            files[rel_path] = cached
+            continue
+        try:
+            with open(full_path, "r", encoding="utf-8") as f:
+                chunks = chunk_file(f.read())
+        except UnicodeDecodeError:
+            chunks = [] # Binary: remember it so it is not re-read until it changes
+        except OSError:
+            continue
+        files[rel_path] = {"mtime": stat.st_mtime, "size": stat.st_size, "chunks": chunks}
+        changed += 1
+
+    # Also rewrites indexes that still hold files now excluded
+    if changed or set(files) != set(old_files):
+        index["files"] = files
+        with open(index_path + ".tmp", "w") as f:
+            json.dump(index, f)
+        os.replace(index_path + ".tmp", index_path)
+    return files, changed
+
+def rank_chunks(files, query, k1=1.5, b=0.75):
+    """Scores every chunk against the query with Okapi BM25."""
+    chunks = [(path, c) for path, entry in files.items() for c in entry["chunks"]]
+    if not chunks:
+        return []
+    terms = set(tokenize(query))
+    avg_len = sum(c["length"] for _, c in chunks) / len(chunks) or 1
+    df = {t: sum(1 for _, c in chunks if t in c["tf"]) for t in terms}
+    scored = []
+    for path, c in chunks:
+        score = 0.0
+        for t in terms:
+            tf = c["tf"].get(t)
+            if not tf:
+                continue
+            idf = math.log(1 + (len(chunks) - df[t] + 0.5) / (df[t] + 0.5))
+            score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * c["length"] / avg_len))
+        # A query that names the file is a strong hint, but only for chunks that already match
+        if score > 0 and terms & set(tokenize(os.path.basename(path))):
+            score += 1.0
+        if score > 0:
+            scored.append((score, path, c))
+    scored.sort(key=lambda s: s[0], reverse=True)
+    return scored
+
+def pack_context(scored, budget):
+    """Greedily fills the token budget (~4 chars per token) with the best chunks."""
+    parts = []
+    used = 0
+    for _, path, c in scored:
+        block = f"--- {path} (line {c['line']}) ---\n{c['text']}\n"
+        cost = len(block) // 4 + 1
+        if used + cost > budget:
+            continue # A smaller chunk further down may still fit
+        parts.append(block)
+        used += cost
+    return "".join(parts), used
+
 @app.command()
-def ask(question: str):
+def ask(
+    question: str,
+    project: bool = typer.Option(False, "--project", "-p", help="Attach relevant code from the current project"),
+    budget: int = typer.Option(None, "--budget", "-b", help="Max tokens of project context to send")
+):
     """🧠 Query the Origins AI (Gemini 3 Flash)"""
     cfg = load_config()
     api_key = cfg.get("gemini_key")
@@ -292,6 +580,19 @@ def ask(question: str):
         api_key = Prompt.ask("🔑 Enter Gemini API Key")
         save_config("gemini_key", api_key)
 
+    contents = question
+    if project:
+        budget = budget or cfg.get("context_budget", DEFAULT_CONTEXT_BUDGET)
+        with console.status("[bold blue]Indexing project...[/bold blue]"):
+            files, changed = update_index(os.getcwd())
+            context, used = pack_context(rank_chunks(files, question), budget)
+        console.print(f"[dim]Indexed {len(files)} files ({changed} updated). Sending ~{used} tokens of context.[/dim]")
+        if context:
+            contents = (
+                "Answer the question using the following excerpts from my project.\n\n"
+                f"{context}\nQuestion: {question}"
+            )
+
     try:
         client = genai.Client(api_key=api_key)
         
@@ -299,7 +600,7 @@ def ask(question: str):
             # Use the exact ID from your debug-ai list
             response = client.models.generate_content(
                 model='gemini-3-flash-preview', 
-                contents=question
+                contents=contents
             )
             
             console.print(Panel(
@@ -310,13 +611,147 @@ def ask(question: str):
     except Exception as e:
         console.print(f"[red]Error: {e}[/red]")
 
+# --- DEPLOY LAYER ---
+DEPLOYS_FILE = os.path.join(CONFIG_DIR, "deploys.json")
+deploys_lock = threading.Lock()
+
+def load_deploys():
+    if os.path.exists(DEPLOYS_FILE):
+        with open(DEPLOYS_FILE, "r") as f:
+            try:
+                return json.load(f)
+            except json.JSONDecodeError:
+                return {}
+    return {}
+
+def record_deploy(project_dir, kind, record):
+    with deploys_lock:
+        deploys = load_deploys()
+        deploys.setdefault(project_dir, {})[kind] = record
+        with open(DEPLOYS_FILE + ".tmp", "w") as f:
+            json.dump(deploys, f, indent=4)
+        os.replace(DEPLOYS_FILE + ".tmp", DEPLOYS_FILE)
+
+def list_build_inputs(project_dir):
+    """Tracked and untracked files minus anything .gitignore excludes."""
+    try:
+        out = subprocess.run(
+            ["git", "ls-files", "-z", "--cached", "--others", "--exclude-standard"],
+            cwd=project_dir, check=True, capture_output=True
+        ).stdout.decode()
+        return sorted(p for p in out.split("\0") if p)
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        pass
+    # Not a git repo: honour plain .gitignore name/glob patterns ourselves
+    patterns = [".git"]
+    ignore_file = os.path.join(project_dir, ".gitignore")
+    if os.path.exists(ignore_file):
+        with open(ignore_file, "r") as f:
+            patterns += [l.strip().strip("/") for l in f if l.strip() and not l.startswith(("#", "!"))]
+    paths = []
+    for dirpath, dirnames, filenames in os.walk(project_dir):
+        dirnames[:] = [d for d in dirnames if not any(fnmatch.fnmatch(d, p) for p in patterns)]
+        for name in filenames:
+            rel_path = os.path.relpath(os.path.join(dirpath, name), project_dir)
+            if not any(fnmatch.fnmatch(name, p) or fnmatch.fnmatch(rel_path, p) for p in patterns):
+                paths.append(rel_path)
+    return sorted(paths)
+
+def hash_build_inputs(project_dir):
+    digest = hashlib.sha256()
+    for rel_path in list_build_inputs(project_dir):
+        full_path = os.path.join(project_dir, rel_path)
+        if not os.path.isfile(full_path):
+            continue # Deleted but still in the git index
+        digest.update(rel_path.encode() + b"\0")
+        with open(full_path, "rb") as f:
+            for block in iter(lambda: f.read(65536), b""):
+                digest.update(block)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+def summarize_failure(res, tool):
+    """Picks the line that explains a failed deploy; the last one is usually hint filler."""
+    lines = [l.strip() for l in (res.stderr or res.stdout).splitlines() if l.strip()]
+    for line in lines:
+        if line.lower().startswith(("fatal:", "error:", "error!")):
+            return line
+    return lines[0] if lines else f"{tool} exited with {res.returncode}"
+
+def deploy_project(project_dir, preview=False, force=False, linked_only=False):
+    """Deploys one project unless its inputs match the last successful deploy.
+
+    With linked_only, Vercel projects that were never linked are reported instead of
+    letting --yes create a brand new production project for them.
+    Returns (status, record) where status is "deployed", "skipped", "unlinked" or "failed".
+    """
+    project_dir = os.path.abspath(project_dir)
+    kind = "preview" if preview else "production"
+    ptype = get_project_type(project_dir)
+
+    if preview or ptype == "web":
+        if linked_only and not os.path.exists(os.path.join(project_dir, ".vercel", "project.json")):
+            return "unlinked", {"error": "Not linked to Vercel, run `vercel link` first"}
+        cmd = ["vercel", "deploy", "--preview", "--yes"] if preview else ["vercel", "--prod", "--yes"]
+        try:
+            input_hash = hash_build_inputs(project_dir)
+        except OSError as e:
+            return "failed", {"error": f"Could not hash build inputs: {e}"}
+    else:
+        # git push ships the main branch, not the working tree, so its commit is the real input
+        cmd = ["git", "push", "origin", "main"]
+        try:
+            input_hash = subprocess.run(
+                ["git", "rev-parse", "refs/heads/main"], cwd=project_dir, check=True, capture_output=True, text=True
+            ).stdout.strip()
+        except (subprocess.CalledProcessError, FileNotFoundError):
+            return "failed", {"error": "No local main branch to push"}
+
+    last = load_deploys().get(project_dir, {}).get(kind)
+    if not force and last and last["hash"] == input_hash:
+        return "skipped", last
+
+    start = time.time()
+    try:
+        # Output is captured behind a spinner (and runs in parallel with --all), so a credential
+        # prompt would hang invisibly; fail fast instead and surface it as a failed deploy
+        res = subprocess.run(
+            cmd, cwd=project_dir, capture_output=True, text=True,
+            stdin=subprocess.DEVNULL, env={**os.environ, "GIT_TERMINAL_PROMPT": "0"}
+        )
+    except FileNotFoundError:
+        return "failed", {"error": f"{cmd[0]} is not installed"}
+    if res.returncode != 0:
+        return "failed", {"error": summarize_failure(res, cmd[0])}
+
+    url = None
+    if cmd[0] == "vercel":
+        # Vercel prints the deployment URL on stdout, progress goes to stderr
+        urls = re.findall(r"https://\S+", res.stdout)
+        url = urls[-1] if urls else None
+    record = {
+        "hash": input_hash,
+        "url": url,
+        "deployed_at": start,
+        "duration": round(time.time() - start, 2),
+    }
+    record_deploy(project_dir, kind, record)
+    return "deployed", record
+
 @app.command()
-def preview():
+def preview(force: bool = typer.Option(False, "--force", "-f", help="Deploy even if nothing changed")):
     """🚀 Launch a temporary cloud preview environment."""
-    console.print("[bold blue]📦 Packaging ephemeral environment...[/bold blue]")
-    # Example for a web project using Vercel
-    subprocess.run(["vercel", "deploy", "--preview"], check=True)
-    console.print("[bold green]✅ Preview live at: https://preview-link-here.com[/bold green]")
+    with console.status("[bold blue]📦 Packaging ephemeral environment...[/bold blue]"):
+        status, record = deploy_project(os.getcwd(), preview=True, force=force)
+    if status == "failed":
+        console.print(f"[bold red]❌ Preview failed:[/bold red] {record['error']}")
+        raise typer.Exit(1)
+    if status == "skipped":
+        console.print("[dim]No changes since the last preview.[/dim]")
+    if record.get("url"):
+        console.print(f"[bold green]✅ Preview live at: {record['url']}[/bold green]")
+    else:
+        console.print("[yellow]✅ Preview deployed, but Vercel did not report a URL. Check [bold]vercel ls[/bold].[/yellow]")
 import subprocess
 from github import Github
 
@@ -336,6 +771,19 @@ def ship_to_github(target_dir: str, repo_name: str):
             user = g.get_user()
             repo = user.create_repo(repo_name, private=True)
         
+        # Build journals hold every prompt, they never belong in the client repo
+        if os.path.exists(os.path.join(target_dir, BUILD_JOURNAL)):
+            ignore_file = os.path.join(target_dir, ".gitignore")
+            existing = ""
+            if os.path.exists(ignore_file):
+                with open(ignore_file, "r") as f:
+                    existing = f.read()
+            if BUILD_JOURNAL not in existing.splitlines():
+                with open(ignore_file, "a") as f:
+                    if existing and not existing.endswith("\n"):
+                        f.write("\n")
+                    f.write(f"{BUILD_JOURNAL}\n")
+
         # 2. Local Git Operations
         with console.status("[bold green]Pushing code to GitHub...[/bold green]"):
             # Initialize local repo
@@ -618,15 +1066,44 @@ def doctor():
         except: console.print(f"❌ {n}: Missing")
 
 @app.command()
-def deploy():
+def deploy(
+    all_projects: bool = typer.Option(False, "--all", "-a", help="Deploy every project in the Software Factory"),
+    force: bool = typer.Option(False, "--force", "-f", help="Deploy even if nothing changed"),
+    jobs: int = typer.Option(4, "--jobs", "-j", help="Max parallel deploys with --all")
+):
     """🚀 One-Click Deploy: Push your project to the cloud."""
-    ptype = get_project_type()
-    if ptype == "web":
-        console.print("🚀 Deploying to Vercel...")
-        os.system("vercel --prod")
-    else:
-        console.print("🚀 Deploying to Render/Railway...")
-        os.system("git push origin main")
+    if not all_projects:
+        target = "Vercel" if get_project_type() == "web" else "Render/Railway"
+        with console.status(f"🚀 Deploying to {target}..."):
+            status, record = deploy_project(os.getcwd(), force=force)
+        if status == "failed":
+            console.print(f"[bold red]❌ Deploy failed:[/bold red] {record['error']}")
+            raise typer.Exit(1)
+        if status == "skipped":
+            console.print("[dim]No changes since the last deploy.[/dim]")
+        else:
+            console.print(f"✅ [bold green]Deployed in {record['duration']}s[/bold green]")
+        if record.get("url"):
+            console.print(f"🔗 [link={record['url']}]{record['url']}[/link]")
+        return
+
+    projects = sorted(d for d in os.listdir(PROJECTS_DIR) if os.path.isdir(os.path.join(PROJECTS_DIR, d)))
+    with console.status(f"🚀 Deploying {len(projects)} projects..."):
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+            results = executor.map(lambda p: deploy_project(os.path.join(PROJECTS_DIR, p), force=force, linked_only=True), projects)
+            results = dict(zip(projects, results))
+
+    table = Table(title="Origins Fleet Deploy")
+    table.add_column("Project", style="cyan")
+    table.add_column("Status")
+    table.add_column("Time", style="magenta")
+    table.add_column("URL / Error", style="green")
+    styles = {"deployed": "green", "skipped": "dim", "unlinked": "yellow", "failed": "red"}
+    for p, (status, record) in results.items():
+        detail = record.get("error") or record.get("url") or ""
+        duration = f"{record['duration']}s" if status == "deployed" else ""
+        table.add_row(p, f"[{styles[status]}]{status}[/{styles[status]}]", duration, str(detail))
+    console.print(table)
 
 @app.command()
 